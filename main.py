@@ -5,60 +5,170 @@ import sys
 from utils.nlp_processor import extract_cos, process_text
 from utils.matrix_generator import generate_matrix
 from data.program_outcomes import PROGRAM_OUTCOMES
-import io
+
+# Medium model ships real 300-d word vectors (sm only has context tensors)
+SPACY_MODEL = 'en_core_web_md'
+
+# Components not needed for CO-PO similarity (sentences come from senter instead)
+EXCLUDED_COMPONENTS = ['parser', 'ner']
 
 # Load spaCy model
 @st.cache_resource
 def load_spacy_model():
     try:
-        return spacy.load('en_core_web_sm')
+        nlp = spacy.load(SPACY_MODEL, exclude=EXCLUDED_COMPONENTS)
     except OSError:
         st.info("Downloading language model... (this may take a while)")
-        spacy.cli.download('en_core_web_sm')
-        return spacy.load('en_core_web_sm')
+        spacy.cli.download(SPACY_MODEL)
+        nlp = spacy.load(SPACY_MODEL, exclude=EXCLUDED_COMPONENTS)
+    # The lightweight senter keeps doc.sents available without the parser
+    nlp.enable_pipe('senter')
+    return nlp
 
-def process_syllabus(content, nlp, threshold):
-    """Process a single syllabus and return its analysis results"""
-    try:
-        cos = extract_cos(content)
-        if not cos:
-            return None
-        
-        matrix, debug_info = generate_matrix(cos, PROGRAM_OUTCOMES, nlp, threshold)
-        
-        # Create matrix dataframe
-        matrix_df = pd.DataFrame(
-            data=matrix,
-            index=pd.Index([f"CO{i+1}" for i in range(len(cos))]),
-            columns=pd.Index([f"PO{i+1}" for i in range(len(PROGRAM_OUTCOMES))])
-        )
-        
-        # Calculate averages
-        averages = []
-        for col in matrix_df.columns:
-            col_values = pd.to_numeric(matrix_df[col], errors='coerce')
-            avg = col_values.mean()
-            averages.append(f"{avg:.2f}" if pd.notnull(avg) else '')
-        
-        matrix_df.loc['Average'] = averages
-        
-        # Create CO dataframe
-        co_data = {
-            'CO': [co[0] for co in cos],
-            'Description': [co[1] for co in cos],
-            'K-Level': [co[2] for co in cos]
-        }
-        co_df = pd.DataFrame(co_data)
-        
-        return {
-            'cos': co_df,
-            'matrix': matrix_df,
-            'debug_info': debug_info,
-            'threshold': threshold
-        }
-    except Exception as e:
-        st.error(f"Error processing syllabus: {str(e)}")
+@st.cache_data(ttl=24*60*60, show_spinner=False)
+def extract_cos_cached(content):
+    """Extract course outcomes from syllabus text (independent of threshold)"""
+    return extract_cos(content)
+
+@st.cache_data(ttl=24*60*60, show_spinner=False)
+def build_matrix_cached(cos, threshold):
+    """Generate the CO-PO matrix and debug info for extracted COs"""
+    # Fetch the model singleton here so it is never hashed or pickled by st.cache_data
+    nlp = load_spacy_model()
+    return generate_matrix(cos, PROGRAM_OUTCOMES, nlp, threshold)
+
+def process_syllabus(content, threshold):
+    """Process a single syllabus and return its analysis results (built on the cached stages)"""
+    cos = extract_cos_cached(content)
+    if not cos:
         return None
+    
+    matrix, debug_info = build_matrix_cached(cos, threshold)
+    
+    # Create matrix dataframe
+    matrix_df = pd.DataFrame(
+        data=matrix,
+        index=pd.Index([f"CO{i+1}" for i in range(len(cos))]),
+        columns=pd.Index([f"PO{i+1}" for i in range(len(PROGRAM_OUTCOMES))])
+    )
+    
+    # Calculate averages
+    averages = matrix_df.apply(pd.to_numeric, errors='coerce').mean(axis=0)
+    matrix_df.loc['Average'] = averages.map(lambda v: f"{v:.2f}" if pd.notnull(v) else '')
+    
+    # Create CO dataframe
+    co_data = {
+        'CO': [co[0] for co in cos],
+        'Description': [co[1] for co in cos],
+        'K-Level': [co[2] for co in cos]
+    }
+    co_df = pd.DataFrame(co_data)
+    
+    return {
+        'cos': co_df,
+        'matrix': matrix_df,
+        'csv': matrix_df.to_csv(index=True),
+        'debug_info': debug_info,
+        'threshold': threshold
+    }
+
+@st.cache_data(ttl=24*60*60, max_entries=100, show_spinner=False)
+def decode_upload(data):
+    """Decode uploaded file bytes to text"""
+    return data.decode("utf-8", errors="replace")
+
+@st.cache_data
+def get_po_dataframe():
+    """Build the (static) Program Outcomes table"""
+    po_data = {
+        'PO': [po[0] for po in PROGRAM_OUTCOMES],
+        'Description': [po[1] for po in PROGRAM_OUTCOMES],
+        'K-Level': [po[2] for po in PROGRAM_OUTCOMES]
+    }
+    return pd.DataFrame(po_data)
+
+@st.cache_data
+def load_css(path):
+    """Read the app stylesheet"""
+    with open(path) as f:
+        return f.read()
+
+@st.fragment
+def render_file(filename):
+    """Render one file's tab; slider changes rerun only this fragment"""
+    results = st.session_state.processed_files[filename]
+    st.subheader(f"Analysis for {filename}")
+    
+    # Display Course Outcomes
+    st.write("Course Outcomes:")
+    st.dataframe(results['cos'])
+    
+    # Add threshold slider for each file
+    current_threshold = st.session_state.file_thresholds.get(filename, 0.80)
+    new_threshold = st.slider(
+        "Similarity Threshold",
+        min_value=0.0,
+        max_value=1.0,
+        value=current_threshold,
+        step=0.01,
+        key=f"threshold_{filename}",
+        help="Adjust the similarity threshold for CO-PO mapping"
+    )
+    
+    # Quantize to the slider step so float noise never misses the cache
+    threshold = round(new_threshold, 2)
+    
+    # Update matrix only if threshold changed; otherwise reuse stored results
+    if threshold != round(current_threshold, 2):
+        # Record the attempt so a failing threshold is only tried once
+        st.session_state.file_thresholds[filename] = threshold
+        try:
+            new_results = process_syllabus(
+                st.session_state.file_contents[filename],
+                threshold
+            )
+            if new_results:
+                st.session_state.processed_files[filename] = new_results
+                results = new_results
+        except Exception as e:
+            st.error(f"Error updating matrix: {str(e)}")
+    
+    if round(results['threshold'], 2) != threshold:
+        st.warning(
+            f"Showing matrix for threshold {results['threshold']:.2f}; "
+            f"threshold {threshold:.2f} could not be applied"
+        )
+    
+    # Display Matrix in container
+    matrix_container = st.container()
+    with matrix_container:
+        st.write("CO-PO Mapping Matrix:")
+        st.dataframe(results['matrix'])
+    
+    # Debug Information
+    with st.expander("Debug Information"):
+        st.write(f"Similarity Threshold: {results['debug_info']['threshold']}")
+    
+        st.write("Similarity Scores:")
+        similarity_df = (
+            pd.DataFrame.from_dict(results['debug_info']['similarity_scores'], orient='index')
+            .rename_axis('CO')
+            .reset_index()
+        )
+        st.dataframe(similarity_df)
+    
+        st.write("Preprocessed Terms:")
+        for co_id, terms in results['debug_info']['preprocessed_terms'].items():
+            st.write(f"{co_id}: {', '.join(terms)}")
+    
+    # Download button for individual file
+    st.download_button(
+        f"Download Matrix for {filename} as CSV",
+        results['csv'],
+        f"co_po_matrix_{filename}.csv",
+        "text/csv",
+        key=f'download-csv-{filename}'
+    )
 
 def main():
     st.set_page_config(page_title="CO-PO Mapping Generator", layout="wide")
@@ -66,8 +176,7 @@ def main():
     st.title("CO-PO Mapping Matrix Generator")
     
     # Load custom CSS
-    with open("assets/app_style.css") as f:
-        st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
+    st.markdown(f"<style>{load_css('assets/app_style.css')}</style>", unsafe_allow_html=True)
 
     # Initialize session states
     if 'processed_files' not in st.session_state:
@@ -80,7 +189,7 @@ def main():
         st.session_state.matrix_states = {}
     
     try:
-        nlp = load_spacy_model()
+        load_spacy_model()
         
         # Multiple file upload
         uploaded_files = st.file_uploader(
@@ -93,22 +202,20 @@ def main():
             # Process new files
             for uploaded_file in uploaded_files:
                 if uploaded_file.name not in st.session_state.file_contents:
-                    content = uploaded_file.getvalue().decode("utf-8")
+                    content = decode_upload(uploaded_file.getvalue())
                     st.session_state.file_contents[uploaded_file.name] = content
                     st.session_state.file_thresholds[uploaded_file.name] = 0.80  # Default threshold
-                    results = process_syllabus(content, nlp, 0.80)
+                    try:
+                        results = process_syllabus(content, 0.80)
+                    except Exception as e:
+                        st.error(f"Error processing syllabus: {str(e)}")
+                        results = None
                     if results:
                         st.session_state.processed_files[uploaded_file.name] = results
             
             # Display POs (common for all files)
             st.subheader("Program Outcomes")
-            po_data = {
-                'PO': [po[0] for po in PROGRAM_OUTCOMES],
-                'Description': [po[1] for po in PROGRAM_OUTCOMES],
-                'K-Level': [po[2] for po in PROGRAM_OUTCOMES]
-            }
-            po_df = pd.DataFrame(po_data)
-            st.dataframe(po_df)
+            st.dataframe(get_po_dataframe())
             
             # Create tabs for each processed file
             if st.session_state.processed_files:
@@ -116,72 +223,7 @@ def main():
                 
                 for tab, filename in zip(tabs, st.session_state.processed_files.keys()):
                     with tab:
-                        st.subheader(f"Analysis for {filename}")
-                        
-                        # Display Course Outcomes
-                        st.write("Course Outcomes:")
-                        st.dataframe(st.session_state.processed_files[filename]['cos'])
-                        
-                        # Add threshold slider for each file
-                        current_threshold = st.session_state.file_thresholds.get(filename, 0.80)
-                        new_threshold = st.slider(
-                            "Similarity Threshold",
-                            min_value=0.0,
-                            max_value=1.0,
-                            value=current_threshold,
-                            step=0.01,
-                            key=f"threshold_{filename}",
-                            help="Adjust the similarity threshold for CO-PO mapping"
-                        )
-                        
-                        # Update matrix if threshold changed
-                        if new_threshold != current_threshold:
-                            st.session_state.file_thresholds[filename] = new_threshold
-                            try:
-                                new_results = process_syllabus(
-                                    st.session_state.file_contents[filename],
-                                    nlp,
-                                    new_threshold
-                                )
-                                if new_results:
-                                    st.session_state.processed_files[filename] = new_results
-                            except Exception as e:
-                                st.error(f"Error updating matrix: {str(e)}")
-                        
-                        # Display Matrix in container
-                        matrix_container = st.container()
-                        with matrix_container:
-                            st.write("CO-PO Mapping Matrix:")
-                            st.dataframe(st.session_state.processed_files[filename]['matrix'])
-                        
-                        # Debug Information
-                        with st.expander("Debug Information"):
-                            results = st.session_state.processed_files[filename]
-                            st.write(f"Similarity Threshold: {results['debug_info']['threshold']}")
-                            
-                            st.write("Similarity Scores:")
-                            similarity_data = []
-                            for co_id, po_scores in results['debug_info']['similarity_scores'].items():
-                                row = {'CO': co_id}
-                                row.update(po_scores)
-                                similarity_data.append(row)
-                            st.dataframe(pd.DataFrame(similarity_data))
-                            
-                            st.write("Preprocessed Terms:")
-                            for co_id, terms in results['debug_info']['preprocessed_terms'].items():
-                                st.write(f"{co_id}: {', '.join(terms)}")
-                        
-                        # Download button for individual file
-                        buffer = io.BytesIO()
-                        st.session_state.processed_files[filename]['matrix'].to_csv(buffer, index=True)
-                        buffer.seek(0)
-                        st.download_button(
-                            f"Download Matrix for {filename} as CSV",
-                            buffer,
-                            f"co_po_matrix_{filename}.csv",
-                            "text/csv",
-                            key=f'download-csv-{filename}'
-                        )
+                        render_file(filename)
             
             # Add button to clear all processed files
             if st.button("Clear All Files"):